@@ -1,565 +1,1029 @@
-import streamlit as st
-import google.generativeai as genai
-import pandas as pd
-from datetime import datetime
-import traceback
-import speech_recognition as sr
-from gtts import gTTS
-import io
-import base64
-import tempfile
-import os
-
-# Page configuration
-st.set_page_config(
-    page_title="Advanced Translation Agent",
-    page_icon="🌐",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Language mappings
-LANGUAGES = {
-    "English": "en", "Spanish": "es", "French": "fr", "German": "de", "Italian": "it",
-    "Portuguese": "pt", "Russian": "ru", "Japanese": "ja", "Korean": "ko", "Chinese (Simplified)": "zh-cn",
-    "Chinese (Traditional)": "zh-tw", "Arabic": "ar", "Hindi": "hi", "Turkish": "tr", "Dutch": "nl",
-    "Swedish": "sv", "Norwegian": "no", "Danish": "da", "Finnish": "fi", "Polish": "pl",
-    "Czech": "cs", "Hungarian": "hu", "Romanian": "ro", "Bulgarian": "bg", "Greek": "el",
-    "Hebrew": "he", "Thai": "th", "Vietnamese": "vi", "Indonesian": "id", "Malay": "ms",
-    "Filipino": "fil", "Ukrainian": "uk", "Croatian": "hr", "Serbian": "sr", "Slovak": "sk"
-}
-
-class TranslationAgent:
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        try:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
-            # Test the connection
-            test_response = self.model.generate_content("Hello")
-            st.success("✅ API connection successful!")
-        except Exception as e:
-            st.error(f"API initialization error: {str(e)}")
-            raise e
-
-    def speech_to_text(self) -> str:
-        """Convert speech to text using speech recognition"""
-        try:
-            r = sr.Recognizer()
-            with sr.Microphone() as source:
-                st.info("🎤 Listening... Please speak clearly.")
-                # Adjust for ambient noise
-                r.adjust_for_ambient_noise(source, duration=1)
-                # Listen for audio
-                audio = r.listen(source, timeout=10, phrase_time_limit=30)
-                
-            st.info("🔄 Processing speech...")
-            # Recognize speech using Google's service
-            text = r.recognize_google(audio)
-            return text
-        except sr.WaitTimeoutError:
-            return "Listening timeout - no speech detected"
-        except sr.UnknownValueError:
-            return "Could not understand the audio"
-        except sr.RequestError as e:
-            return f"Speech recognition error: {str(e)}"
-        except Exception as e:
-            return f"Error: {str(e)}"
-
-    def text_to_speech(self, text: str, language: str = "English") -> bytes:
-        """Convert text to speech using gTTS"""
-        try:
-            # Map language names to gTTS language codes
-            gtts_codes = {
-                "English": "en", "Spanish": "es", "French": "fr", "German": "de", 
-                "Italian": "it", "Portuguese": "pt", "Russian": "ru", "Japanese": "ja", 
-                "Korean": "ko", "Chinese (Simplified)": "zh", "Chinese (Traditional)": "zh-tw", 
-                "Arabic": "ar", "Hindi": "hi", "Turkish": "tr", "Dutch": "nl", 
-                "Swedish": "sv", "Norwegian": "no", "Danish": "da", "Finnish": "fi", 
-                "Polish": "pl", "Czech": "cs", "Hungarian": "hu", "Thai": "th", 
-                "Vietnamese": "vi", "Indonesian": "id", "Ukrainian": "uk"
-            }
-            
-            # Get language code, default to 'en' if not found
-            lang_code = gtts_codes.get(language, "en")
-            
-            # Clean text for TTS
-            clean_text = text.strip()
-            if not clean_text:
-                return None
-                
-            # Create gTTS object
-            tts = gTTS(text=clean_text, lang=lang_code, slow=False)
-            
-            # Save to bytes buffer
-            audio_buffer = io.BytesIO()
-            tts.write_to_fp(audio_buffer)
-            audio_buffer.seek(0)
-            
-            return audio_buffer.getvalue()
-        except Exception as e:
-            st.error(f"Text-to-speech error: {str(e)}")
-            return None
-
-    def detect_language(self, text: str) -> str:
-        try:
-            prompt = f"What language is this text written in? Respond with only the language name in English:\n\n{text[:200]}"
-            response = self.model.generate_content(prompt)
-            detected = response.text.strip()
-            
-            # Match with our language list
-            for lang_name in LANGUAGES.keys():
-                if lang_name.lower() in detected.lower():
-                    return lang_name
-            return "English"
-        except Exception as e:
-            st.warning(f"Language detection failed: {str(e)}")
-            return "English"
-
-    def translate_text(self, text: str, source_lang: str, target_lang: str, translation_type: str = "standard"):
-        if not text.strip():
-            return "No text provided"
-        
-        try:
-            # Create simple, effective prompts
-            if translation_type == "standard":
-                prompt = f"Translate this text from {source_lang} to {target_lang}. Only provide the translation:\n\n{text}"
-            elif translation_type == "creative":
-                prompt = f"Translate this creative text from {source_lang} to {target_lang}, preserving style and artistic meaning:\n\n{text}"
-            elif translation_type == "technical":
-                prompt = f"Translate this technical text from {source_lang} to {target_lang}, maintaining technical accuracy:\n\n{text}"
-            elif translation_type == "formal":
-                prompt = f"Translate this text from {source_lang} to {target_lang} using formal, professional language:\n\n{text}"
-            else:
-                prompt = f"Translate from {source_lang} to {target_lang}:\n\n{text}"
-            
-            # Generate translation
-            response = self.model.generate_content(prompt)
-            
-            if response and response.text:
-                result = response.text.strip()
-                return result
-            else:
-                return "No translation received from API"
-                
-        except Exception as e:
-            error_msg = f"Translation error: {str(e)}"
-            st.error(error_msg)
-            return error_msg
-
-def create_audio_player(audio_data: bytes, key: str = None) -> None:
-    """Create audio player using Streamlit's native audio widget"""
-    if audio_data:
-        try:
-            # Use Streamlit's built-in audio player
-            st.audio(audio_data, format='audio/mp3')
-        except Exception as e:
-            st.error(f"Audio playback error: {str(e)}")
-    else:
-        st.error("No audio data available")
-
-def create_download_link(audio_data: bytes, filename: str) -> None:
-    """Create a download button for audio data"""
-    if audio_data:
-        st.download_button(
-            label="⬇️ Download Audio",
-            data=audio_data,
-            file_name=filename,
-            mime="audio/mp3"
-        )
-
-def display_translation_result(result: str, translation_type: str = "standard", target_language: str = "English", translator=None):
-    """Display translation result with proper styling"""
-    
-    # Color schemes for different translation types
-    color_schemes = {
-        "standard": {"bg": "#f0f8f0", "border": "#4CAF50", "icon": "📝"},
-        "creative": {"bg": "#faf0ff", "border": "#9C27B0", "icon": "🎨"},
-        "technical": {"bg": "#e8f4f8", "border": "#2196F3", "icon": "⚙️"},
-        "formal": {"bg": "#fff8e8", "border": "#FF9800", "icon": "👔"},
-        "voice": {"bg": "#f0f8ff", "border": "#4169E1", "icon": "🎤"}
-    }
-    
-    scheme = color_schemes.get(translation_type, color_schemes["standard"])
-    
-    # Clean the result text (remove any unwanted formatting)
-    clean_result = result.replace("**", "").strip()
-    
-    # Display with improved styling
-    st.markdown(f"""
-    <div style="
-        background-color: {scheme['bg']}; 
-        padding: 20px; 
-        border-radius: 10px; 
-        border-left: 5px solid {scheme['border']};
-        margin: 10px 0;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    ">
-        <h4 style="
-            color: {scheme['border']}; 
-            margin-top: 0; 
-            margin-bottom: 15px;
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        ">
-            {scheme['icon']} Translation Result
-        </h4>
-        <p style="
-            font-size: 16px; 
-            line-height: 1.5; 
-            margin: 0;
-            color: #333;
-            white-space: pre-wrap;
-        ">{clean_result}</p>
-    </div>
-    """, unsafe_allow_html=True)
-
-def main():
-    st.title("🌐 Advanced Translation Agent")
-    st.markdown("*Powered by Google Gemini AI*")
-    
-    # Custom CSS for better styling
-    st.markdown("""
-    <style>
-    .stTextArea textarea {
-        background-color: #fafdff;
-        border: 2px solid #e9ecef;
-        border-radius: 8px;
-    }
-    .stTextArea textarea:focus {
-        border-color: #007bff;
-        box-shadow: 0 0 0 0.2rem rgba(0,123,255,.25);
-    }
-    .stSelectbox > div > div {
-        background-color: #fafdff;
-        border-radius: 8px;
-    }
-    .audio-section {
-        background-color: #f0f8ff;
-        padding: 15px;
-        border-radius: 10px;
-        border: 1px solid #4169E1;
-        margin: 10px 0;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
-    # Sidebar configuration
-    with st.sidebar:
-        st.header("🔧 Configuration")
-        
-        # API Key input with better instructions
-        st.markdown("### Google AI API Key")
-        st.markdown("1. Go to [Google AI Studio](https://aistudio.google.com/app/apikey)")
-        st.markdown("2. Create a new API key")
-        st.markdown("3. Paste it below:")
-        
-        api_key = st.text_input("API Key", type="password", placeholder="Your Google AI API key here...")
-        
-        if not api_key:
-            st.error("⚠️ Please enter your Google AI API key to continue")
-            st.stop()
-        
-        # Test API key
-        with st.spinner("Testing API connection..."):
-            try:
-                translator = TranslationAgent(api_key)
-            except Exception as e:
-                st.error(f"❌ API connection failed: {str(e)}")
-                st.info("Please check your API key and try again.")
-                st.stop()
-        
-        # Feature selection
-        st.header("🚀 Features")
-        selected_feature = st.selectbox(
-            "Choose Translation Feature",
-            ["Standard Translation", "Voice Translation", "Creative Translation", "Technical Translation", 
-             "Formal Translation", "Document Translation", "Batch Translation", 
-             "Language Detection", "Translation History"]
-        )
-
-    # Initialize session state
-    if 'translation_history' not in st.session_state:
-        st.session_state.translation_history = []
-
-    # Voice Translation - Fixed Version
-    if selected_feature == "Voice Translation":
-        st.header("🎤 Voice Translation")
-        st.info("Speak in one language and get voice output in another!")
-        
-        # Check if required packages are available
-        try:
-            import speech_recognition as sr
-            from gtts import gTTS
-        except ImportError:
-            st.error("📦 Required packages missing. Please install: pip install SpeechRecognition gTTS pyaudio")
-            st.info("Note: You may also need to install portaudio for microphone support")
-            return
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            source_lang_voice = st.selectbox("Source Language", list(LANGUAGES.keys()), key="voice_source")
-        with col2:
-            target_lang_voice = st.selectbox("Target Language", list(LANGUAGES.keys()), index=1, key="voice_target")
-        
-        # Voice input section
-        st.markdown("### 🎤 Voice Input")
-        col1, col2, col3 = st.columns([2, 1, 2])
-        
-        with col1:
-            if st.button("🎤 Start Recording", type="primary", use_container_width=True):
-                with st.spinner("Initializing microphone..."):
-                    spoken_text = translator.speech_to_text()
-                    
-                if spoken_text and not spoken_text.startswith("Error") and not spoken_text.startswith("Could not") and not spoken_text.startswith("Listening timeout"):
-                    st.session_state.voice_input = spoken_text
-                    st.success(f"✅ Speech captured: '{spoken_text}'")
-                else:
-                    st.error(f"❌ {spoken_text}")
-        
-        with col2:
-            st.markdown("<div style='text-align: center; padding: 10px;'>OR</div>", unsafe_allow_html=True)
-            
-        with col3:
-            if st.button("📝 Use Text Input", use_container_width=True):
-                st.session_state.use_text_input = True
-        
-        # Display captured text or text input
-        if hasattr(st.session_state, 'voice_input'):
-            voice_text = st.text_area("Captured Speech:", 
-                                    value=st.session_state.voice_input, 
-                                    height=100, 
-                                    key="voice_display")
-        elif hasattr(st.session_state, 'use_text_input') and st.session_state.use_text_input:
-            voice_text = st.text_area("Enter text for voice translation:", 
-                                    height=100, 
-                                    placeholder="Type your text here...",
-                                    key="voice_text_input")
-        else:
-            voice_text = st.text_area("Speech will appear here after recording:", 
-                                    height=100, 
-                                    disabled=True,
-                                    key="voice_placeholder")
-        
-        # Translation and audio output
-        if st.button("🔄 Translate & Speak", type="primary", use_container_width=True):
-            if voice_text and voice_text.strip():
-                with st.spinner("Translating..."):
-                    # Perform translation
-                    result = translator.translate_text(voice_text, source_lang_voice, target_lang_voice, "voice")
-                    
-                    if result and "Translation error" not in result and "No translation" not in result:
-                        st.success("✅ Voice translation completed!")
-                        
-                        # Display translation result
-                        display_translation_result(result, "voice", target_lang_voice, translator)
-                        
-                        # Generate and display audio files
-                        st.markdown("### 🔊 Audio Playback")
-                        
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.markdown("**🎤 Original Audio**")
-                            st.write(f"Language: {source_lang_voice}")
-                            st.write(f"Text: _{voice_text[:50]}{'...' if len(voice_text) > 50 else ''}_")
-                            
-                            with st.spinner("Generating original audio..."):
-                                original_audio = translator.text_to_speech(voice_text, source_lang_voice)
-                                if original_audio:
-                                    create_audio_player(original_audio)
-                                    create_download_link(original_audio, f"original_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp3")
-                                else:
-                                    st.error("Failed to generate original audio")
-                        
-                        with col2:
-                            st.markdown("**🌐 Translation Audio**")
-                            st.write(f"Language: {target_lang_voice}")
-                            st.write(f"Text: _{result[:50]}{'...' if len(result) > 50 else ''}_")
-                            
-                            with st.spinner("Generating translation audio..."):
-                                translation_audio = translator.text_to_speech(result, target_lang_voice)
-                                if translation_audio:
-                                    create_audio_player(translation_audio)
-                                    create_download_link(translation_audio, f"translation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp3")
-                                else:
-                                    st.error("Failed to generate translation audio")
-                        
-                        
-                        # Save to history
-                        st.session_state.translation_history.append({
-                            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            'source_lang': source_lang_voice,
-                            'target_lang': target_lang_voice,
-                            'original': voice_text,
-                            'translation': result,
-                            'type': 'voice'
-                        })
-                        
-                        st.balloons()
-                    else:
-                        st.error(f"❌ Translation failed: {result}")
-            else:
-                st.warning("⚠️ Please record speech or enter text first.")
-        
-        # Voice translation tips
-        with st.expander("💡 Voice Translation Tips"):
-            st.markdown("""
-            **For better results:**
-            - Speak clearly and at a moderate pace
-            - Minimize background noise
-            - Use short sentences for better accuracy
-            - Ensure your microphone is working properly
-            
-            **Audio Features:**
-            - ✅ Native Streamlit audio player (no external dependencies)
-            - ✅ Direct download of MP3 files
-            - ✅ Reliable audio generation and playback
-            - ✅ Works across all browsers and devices
-            
-            **Requirements:**
-            - Working microphone
-            - Internet connection for speech services
-            - Audio output device for playback
-            
-            **Troubleshooting:**
-            - Audio now uses Streamlit's native player - should work reliably
-            - If microphone doesn't work, try refreshing the page
-            - Check browser permissions for microphone access
-            - Use the "Use Text Input" option as an alternative
-            """)
-
-    # Standard Translation
-    elif selected_feature == "Standard Translation":
-        st.header("📝 Standard Translation")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            source_lang = st.selectbox("Source Language", ["Auto-detect"] + list(LANGUAGES.keys()))
-        with col2:
-            target_lang = st.selectbox("Target Language", list(LANGUAGES.keys()), index=1)
-        
-        # Example texts for testing
-        example_texts = {
-            "English to Spanish": "Hello, how are you today?",
-            "Spanish to English": "Hola, ¿cómo estás hoy?",
-            "French to English": "Bonjour, comment allez-vous?",
-            "Custom": ""
-        }
-        
-        selected_example = st.selectbox("Quick Examples (optional):", list(example_texts.keys()))
-        
-        if selected_example != "Custom":
-            text_input = st.text_area("Enter text to translate", 
-                                    value=example_texts[selected_example], 
-                                    height=150)
-        else:
-            text_input = st.text_area("Enter text to translate", height=150)
-        
-        if st.button("🔄 Translate", type="primary", use_container_width=True):
-            if text_input.strip():
-                with st.spinner("Translating..."):
-                    try:
-                        # Auto-detect language if needed
-                        if source_lang == "Auto-detect":
-                            detected_lang = translator.detect_language(text_input)
-                            st.info(f"🔍 Detected language: **{detected_lang}**")
-                            source_lang = detected_lang
-                        
-                        # Perform translation
-                        result = translator.translate_text(text_input, source_lang, target_lang, "standard")
-                        
-                        if result and "Translation error" not in result and "No translation" not in result:
-                            st.success("✅ Translation completed successfully!")
-                            
-                            # Display translation with improved styling
-                            display_translation_result(result, "standard", target_lang, translator)
-                            
-                            # Add audio playback option
-                           # st.markdown("### 🔊 Audio Playback")
-                            #if st.button("🔊 Generate Audio", key=f"play_standard_{hash(result)}"):
-                             #   with st.spinner("Generating audio..."):
-                              #      audio_data = translator.text_to_speech(result, target_lang)
-                               #     if audio_data:
-                                #        create_audio_player(audio_data)
-                                 #       create_download_link(audio_data, f"translation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp3")
-                                  #      st.success("🔊 Audio generated successfully!")
-                                   # else:
-                                    #    st.error("Failed to generate audio")
-                            
-                            # Copy area
-                            st.text_area("📋 Copy Translation:", value=result, height=80, key="copy_standard")
-                            
-                            # Save to history
-                            st.session_state.translation_history.append({
-                                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                'source_lang': source_lang,
-                                'target_lang': target_lang,
-                                'original': text_input,
-                                'translation': result,
-                                'type': 'standard'
-                            })
-                            
-                            st.balloons()
-                        else:
-                            st.error(f"❌ Translation failed: {result}")
-                            
-                    except Exception as e:
-                        st.error(f"❌ An error occurred: {str(e)}")
-            else:
-                st.warning("⚠️ Please enter some text to translate.")
-
-    # Translation History
-    elif selected_feature == "Translation History":
-        st.header("📚 Translation History")
-        
-        if st.session_state.translation_history:
-            st.info(f"Total translations: {len(st.session_state.translation_history)}")
-            
-            # Display history
-            for i, entry in enumerate(reversed(st.session_state.translation_history)):
-                with st.expander(f"Translation {len(st.session_state.translation_history) - i}: {entry['source_lang']} → {entry['target_lang']} ({entry['type']})"):
-                    st.write(f"**Timestamp:** {entry['timestamp']}")
-                    st.write(f"**Original ({entry['source_lang']}):** {entry['original']}")
-                    st.write(f"**Translation ({entry['target_lang']}):** {entry['translation']}")
-                    
-                    # Option to regenerate audio for history items
-                    if st.button(f"🔊 Generate Audio", key=f"history_audio_{i}"):
-                        with st.spinner("Generating audio..."):
-                            audio_data = translator.text_to_speech(entry['translation'], entry['target_lang'])
-                            if audio_data:
-                                create_audio_player(audio_data)
-                                st.success("Audio generated!")
-                            else:
-                                st.error("Failed to generate audio")
-            
-            # Clear history option
-            if st.button("🗑️ Clear History", type="secondary"):
-                st.session_state.translation_history = []
-                st.success("History cleared!")
-                st.rerun()
-        else:
-            st.info("No translation history yet. Start translating to see your history here!")
-
-    # Other features placeholder
-    else:
-        st.header(f"🔧 {selected_feature}")
-        st.info(f"The {selected_feature} feature is coming soon! For now, try Voice Translation or Standard Translation.")
-        
-        # Show available features
-        st.markdown("### Available Features:")
-        st.markdown("- ✅ **Voice Translation** - Speak and get voice output")
-        st.markdown("- ✅ **Standard Translation** - Text-to-text translation")
-        st.markdown("- ✅ **Translation History** - View your translation history")
-        st.markdown("- 🚧 Other features coming soon...")
-
-    # Footer
-    st.markdown("---")
-    st.markdown("🌐 **Advanced Translation Agent** | Powered by Google Gemini AI")
-    st.markdown("**✅ Fixed Audio Version** - All audio controls now working with native Streamlit audio player!")
-
-if __name__ == "__main__":
-
-    main()
-
+import streamlit as st
+import google.generativeai as genai
+from datetime import datetime
+import speech_recognition as sr
+from gtts import gTTS
+import io
+import sqlite3
+import threading
+import functools
+import hashlib
+import re
+import html
+import string
+import types
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Optional offline language detection; Gemini is used when it's missing
+try:
+    import langdetect
+    langdetect.DetectorFactory.seed = 0
+except ImportError:
+    langdetect = None
+
+# Page configuration
+st.set_page_config(
+    page_title="Advanced Translation Agent",
+    page_icon="🌐",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Language mappings
+LANGUAGES = {
+    "English": "en", "Spanish": "es", "French": "fr", "German": "de", "Italian": "it",
+    "Portuguese": "pt", "Russian": "ru", "Japanese": "ja", "Korean": "ko", "Chinese (Simplified)": "zh-cn",
+    "Chinese (Traditional)": "zh-tw", "Arabic": "ar", "Hindi": "hi", "Turkish": "tr", "Dutch": "nl",
+    "Swedish": "sv", "Norwegian": "no", "Danish": "da", "Finnish": "fi", "Polish": "pl",
+    "Czech": "cs", "Hungarian": "hu", "Romanian": "ro", "Bulgarian": "bg", "Greek": "el",
+    "Hebrew": "he", "Thai": "th", "Vietnamese": "vi", "Indonesian": "id", "Malay": "ms",
+    "Filipino": "fil", "Ukrainian": "uk", "Croatian": "hr", "Serbian": "sr", "Slovak": "sk"
+}
+_LANGUAGE_NAMES = tuple(LANGUAGES)
+# langdetect codes -> language names ("tl" is langdetect's code for Filipino)
+_CODE_TO_NAME = types.MappingProxyType({**{code: name for name, code in LANGUAGES.items()}, "tl": "Filipino"})
+# Local detections below this probability are re-checked with Gemini
+LOCAL_DETECT_MIN_PROB = 0.9
+
+# Map language names to gTTS language codes
+_GTTS_CODES = types.MappingProxyType({
+    "English": "en", "Spanish": "es", "French": "fr", "German": "de", 
+    "Italian": "it", "Portuguese": "pt", "Russian": "ru", "Japanese": "ja", 
+    "Korean": "ko", "Chinese (Simplified)": "zh", "Chinese (Traditional)": "zh-tw", 
+    "Arabic": "ar", "Hindi": "hi", "Turkish": "tr", "Dutch": "nl", 
+    "Swedish": "sv", "Norwegian": "no", "Danish": "da", "Finnish": "fi", 
+    "Polish": "pl", "Czech": "cs", "Hungarian": "hu", "Thai": "th", 
+    "Vietnamese": "vi", "Indonesian": "id", "Ukrainian": "uk"
+})
+
+# Color schemes for different translation types
+_COLOR_SCHEMES = types.MappingProxyType({
+    "standard": {"bg": "#f0f8f0", "border": "#4CAF50", "icon": "📝"},
+    "creative": {"bg": "#faf0ff", "border": "#9C27B0", "icon": "🎨"},
+    "technical": {"bg": "#e8f4f8", "border": "#2196F3", "icon": "⚙️"},
+    "formal": {"bg": "#fff8e8", "border": "#FF9800", "icon": "👔"},
+    "voice": {"bg": "#f0f8ff", "border": "#4169E1", "icon": "🎤"}
+})
+
+# Styled card for translation results; the text must be HTML-escaped before substitution
+_RESULT_TPL = string.Template("""
+    <div style="
+        background-color: $bg; 
+        padding: 20px; 
+        border-radius: 10px; 
+        border-left: 5px solid $border;
+        margin: 10px 0;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+    ">
+        <h4 style="
+            color: $border; 
+            margin-top: 0; 
+            margin-bottom: 15px;
+            display: flex;
+            align-items: center;
+            gap: 8px;
+        ">
+            $icon Translation Result
+        </h4>
+        <p style="
+            font-size: 16px; 
+            line-height: 1.5; 
+            margin: 0;
+            color: #333;
+            white-space: pre-wrap;
+        ">$text</p>
+    </div>
+""")
+
+# Example texts for testing
+_EXAMPLE_TEXTS = types.MappingProxyType({
+    "English to Spanish": "Hello, how are you today?",
+    "Spanish to English": "Hola, ¿cómo estás hoy?",
+    "French to English": "Bonjour, comment allez-vous?",
+    "Custom": ""
+})
+_EXAMPLE_NAMES = tuple(_EXAMPLE_TEXTS)
+
+# Maximum number of translations kept in the session cache
+TRANSLATION_CACHE_SIZE = 256
+# Maximum number of synthesized MP3 clips kept in the session cache
+TTS_CACHE_SIZE = 64
+# Bytes of MP3 to buffer before handing a first playable prefix to the player
+TTS_FIRST_FLUSH_BYTES = 16 * 1024
+# On-disk translation history, rendered one page at a time
+HISTORY_DB_PATH = ".xlate_history.db"
+HISTORY_PAGE_SIZE = 20
+# Parallel gTTS requests used when synthesizing multi-sentence text
+TTS_MAX_WORKERS = 4
+# Shorter sentence fragments are merged with their neighbour before synthesis
+MIN_SENTENCE_CHARS = 10
+
+# Sentence splitting for the TTS pipeline: break after . ! ? unless it ends a common abbreviation
+_ABBREVIATIONS = ("Dr.", "Mr.", "Mrs.", "Ms.", "Prof.", "Sr.", "Jr.", "St.", "vs.", "etc.", "e.g.", "i.e.")
+_SENT_RE = re.compile(
+    r'(?<=[.!?])' + "".join(rf'(?<!\b{re.escape(abbr)})' for abbr in _ABBREVIATIONS) + r'\s+',
+    re.IGNORECASE
+)
+_BATCH_MARKER_RE = re.compile(r'\[\[(\d+)\]\]')
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+# Markdown emphasis the model sometimes wraps translations in
+_CLEAN_RE = re.compile(r'\*\*|__|`')
+
+def _split_sentences(text: str) -> list:
+    """Split text into sentences, merging fragments shorter than MIN_SENTENCE_CHARS into a neighbour"""
+    sentences = []
+    for piece in _SENT_RE.split(text.strip()):
+        if sentences and len(sentences[-1]) < MIN_SENTENCE_CHARS:
+            sentences[-1] = f"{sentences[-1]} {piece}"
+        else:
+            sentences.append(piece)
+    
+    if len(sentences) > 1 and len(sentences[-1]) < MIN_SENTENCE_CHARS:
+        tail = sentences.pop()
+        sentences[-1] = f"{sentences[-1]} {tail}"
+    return sentences
+
+class TranslationAgent:
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        try:
+            genai.configure(api_key=api_key)
+            self.model = genai.GenerativeModel('gemini-1.5-flash')
+            self.check_connection()
+        except Exception as e:
+            st.error(f"API initialization error: {str(e)}")
+            raise e
+
+        # Per-instance LRU over normalized detection keys
+        self._detect_cached = functools.lru_cache(maxsize=512)(self._detect_language_uncached)
+
+        # MP3 bytes keyed on (lang_code, text), shared across reruns via session state
+        if 'tts_cache' not in st.session_state:
+            st.session_state.tts_cache = OrderedDict()
+        self._tts_cache: "OrderedDict[tuple, bytes]" = st.session_state.tts_cache
+
+        # One recognizer per session; ambient-noise calibration only runs on first use
+        if 'recognizer' not in st.session_state:
+            st.session_state.recognizer = sr.Recognizer()
+            st.session_state.recognizer_calibrated = False
+        self._recognizer = st.session_state.recognizer
+
+    def check_connection(self) -> None:
+        """Test the connection in the background, once per API key per session"""
+        key_hash = hashlib.sha256(self.api_key.encode("utf-8")).hexdigest()
+        if st.session_state.get('api_ok') == key_hash:
+            return
+
+        probe = st.session_state.get('api_probe')
+        if probe is None or probe['key'] != key_hash:
+            executor = ThreadPoolExecutor(max_workers=1)
+            future = executor.submit(self.model.generate_content, "Hello")
+            executor.shutdown(wait=False)
+            st.session_state.api_probe = {'key': key_hash, 'future': future}
+        elif probe['future'].done():
+            # Drop the finished probe so a failed key is re-tested on the next rerun
+            del st.session_state['api_probe']
+            error = probe['future'].exception()
+            if error:
+                raise error
+            st.session_state.api_ok = key_hash
+            st.success("✅ API connection successful!")
+
+    def speech_to_text(self) -> str:
+        """Convert speech to text using speech recognition"""
+        try:
+            r = self._recognizer
+            with sr.Microphone() as source:
+                # Adjust for ambient noise once; the dynamic energy threshold tracks drift afterwards
+                if not st.session_state.recognizer_calibrated:
+                    r.adjust_for_ambient_noise(source, duration=1)
+                    st.session_state.recognizer_calibrated = True
+                st.info("🎤 Listening... Please speak clearly.")
+                # Listen for audio
+                audio = r.listen(source, timeout=10, phrase_time_limit=30)
+                
+            st.info("🔄 Processing speech...")
+            # Recognize speech using Google's service
+            text = r.recognize_google(audio)
+            return text
+        except sr.WaitTimeoutError:
+            return "Listening timeout - no speech detected"
+        except sr.UnknownValueError:
+            return "Could not understand the audio"
+        except sr.RequestError as e:
+            return f"Speech recognition error: {str(e)}"
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+    def _synthesize_sentence(self, sentence: str, lang_code: str) -> bytes:
+        """Synthesize a single sentence with gTTS (safe to call from worker threads)"""
+        return b"".join(gTTS(text=sentence, lang=lang_code, slow=False).stream())
+
+    def text_to_speech_stream(self, text: str, language: str = "English"):
+        """Yield progressively longer MP3 prefixes as gTTS synthesizes, ending with the full clip"""
+        # Get language code, default to 'en' if not found
+        lang_code = _GTTS_CODES.get(language, "en")
+        
+        # Clean text for TTS
+        clean_text = text.strip()
+        if not clean_text:
+            return
+
+        # Reuse previously synthesized audio
+        cache_key = (lang_code, clean_text)
+        if cache_key in self._tts_cache:
+            self._tts_cache.move_to_end(cache_key)
+            yield self._tts_cache[cache_key]
+            return
+            
+        # Synthesize multi-sentence text concurrently; results are consumed in order and
+        # MP3 frames are independently decodable, so the clips concatenate cleanly
+        sentences = _split_sentences(clean_text)
+        executor = None
+        if len(sentences) > 1:
+            executor = ThreadPoolExecutor(max_workers=min(TTS_MAX_WORKERS, len(sentences)))
+            chunks = executor.map(self._synthesize_sentence, sentences, [lang_code] * len(sentences))
+        else:
+            chunks = gTTS(text=clean_text, lang=lang_code, slow=False).stream()
+        
+        # Collect chunks as they arrive, flushing once enough audio is buffered to play smoothly
+        audio_buffer = io.BytesIO()
+        flushed_size = 0
+        try:
+            for chunk in chunks:
+                audio_buffer.write(chunk)
+                if not flushed_size and audio_buffer.tell() >= TTS_FIRST_FLUSH_BYTES:
+                    flushed_size = audio_buffer.tell()
+                    yield audio_buffer.getvalue()
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        audio_data = audio_buffer.getvalue()
+        self._tts_cache[cache_key] = audio_data
+        if len(self._tts_cache) > TTS_CACHE_SIZE:
+            self._tts_cache.popitem(last=False)
+        if len(audio_data) > flushed_size:
+            yield audio_data
+
+    def text_to_speech(self, text: str, language: str = "English") -> bytes:
+        """Convert text to speech using gTTS"""
+        try:
+            audio_data = None
+            for audio_data in self.text_to_speech_stream(text, language):
+                pass
+            return audio_data
+        except Exception as e:
+            st.error(f"Text-to-speech error: {str(e)}")
+            return None
+
+    def _detect_language_uncached(self, key: str) -> str:
+        """Ask Gemini for the language of a normalized text key (raises on API failure)"""
+        prompt = f"What language is this text written in? Respond with only the language name in English:\n\n{key}"
+        response = self.model.generate_content(prompt)
+        detected = response.text.strip()
+
+        # Match with our language list
+        for lang_name in _LANGUAGE_NAMES:
+            if lang_name.lower() in detected.lower():
+                return lang_name
+        return "English"
+
+    def detect_language(self, text: str) -> str:
+        # Normalize so repeated or near-identical inputs share a cache entry
+        key = text[:200].strip().lower()
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+        # Session cache survives Streamlit reruns
+        if 'lang_cache' not in st.session_state:
+            st.session_state.lang_cache = {}
+        lang_cache = st.session_state.lang_cache
+        if digest in lang_cache:
+            return lang_cache[digest]
+
+        # Detect offline when the local model is confident and the language is one we support
+        if langdetect is not None:
+            try:
+                best = langdetect.detect_langs(text[:500])[0]
+                if best.prob >= LOCAL_DETECT_MIN_PROB and best.lang in _CODE_TO_NAME:
+                    lang_cache[digest] = _CODE_TO_NAME[best.lang]
+                    return lang_cache[digest]
+            except langdetect.LangDetectException:
+                pass
+
+        try:
+            detected = self._detect_cached(key)
+            lang_cache[digest] = detected
+            return detected
+        except Exception as e:
+            st.warning(f"Language detection failed: {str(e)}")
+            return "English"
+
+    def _build_prompt(self, text: str, source_lang: str, target_lang: str, translation_type: str) -> str:
+        # Create simple, effective prompts
+        if translation_type == "standard":
+            return f"Translate this text from {source_lang} to {target_lang}. Only provide the translation:\n\n{text}"
+        elif translation_type == "creative":
+            return f"Translate this creative text from {source_lang} to {target_lang}, preserving style and artistic meaning:\n\n{text}"
+        elif translation_type == "technical":
+            return f"Translate this technical text from {source_lang} to {target_lang}, maintaining technical accuracy:\n\n{text}"
+        elif translation_type == "formal":
+            return f"Translate this text from {source_lang} to {target_lang} using formal, professional language:\n\n{text}"
+        else:
+            return f"Translate from {source_lang} to {target_lang}:\n\n{text}"
+
+    def _prefetch_key(self, text: str, source_lang: str, target_lang: str, translation_type: str) -> str:
+        # Punctuation and case differences between the preflight and final transcript don't matter
+        stripped = " ".join(_PUNCTUATION_RE.sub("", text).split()).casefold()
+        return f"{translation_type}|{source_lang}|{target_lang}|{stripped}"
+
+    def prefetch_translation(self, text: str, source_lang: str, target_lang: str, translation_type: str = "standard") -> None:
+        """Start translating in the background so the result is ready when the user asks for it"""
+        if not text.strip():
+            return
+        prompt = self._build_prompt(text, source_lang, target_lang, translation_type)
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(self.model.generate_content, prompt)
+        executor.shutdown(wait=False)
+        st.session_state.translation_prefetch = {
+            'key': self._prefetch_key(text, source_lang, target_lang, translation_type),
+            'future': future
+        }
+
+    def _cache_key(self, text: str, source_lang: str, target_lang: str, translation_type: str) -> str:
+        # Whitespace and case differences map to the same entry
+        normalized = " ".join(text.split()).casefold()
+        return hashlib.blake2b(
+            f"{translation_type}|{source_lang}|{target_lang}|{normalized}".encode("utf-8"),
+            digest_size=16
+        ).hexdigest()
+
+    def _cached_translation(self, cache_key: str):
+        if 'xlate_cache' not in st.session_state:
+            st.session_state.xlate_cache = OrderedDict()
+        xlate_cache = st.session_state.xlate_cache
+        if cache_key in xlate_cache:
+            xlate_cache.move_to_end(cache_key)
+            return xlate_cache[cache_key]
+        return None
+
+    def _store_translation(self, cache_key: str, result: str) -> None:
+        xlate_cache = st.session_state.xlate_cache
+        xlate_cache[cache_key] = result
+        if len(xlate_cache) > TRANSLATION_CACHE_SIZE:
+            xlate_cache.popitem(last=False)
+
+    def translate_text(self, text: str, source_lang: str, target_lang: str, translation_type: str = "standard", placeholder=None):
+        """Translate text; when a placeholder is given the output is streamed into it as it arrives"""
+        if not text.strip():
+            return "No text provided"
+
+        # Return a cached translation for identical requests
+        cache_key = self._cache_key(text, source_lang, target_lang, translation_type)
+        cached = self._cached_translation(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            # Use a preflight translation if it was started for the same text, otherwise discard it
+            prefetch = st.session_state.pop('translation_prefetch', None)
+            if prefetch and prefetch['key'] == self._prefetch_key(text, source_lang, target_lang, translation_type):
+                response = prefetch['future'].result()
+            elif placeholder is not None:
+                prompt = self._build_prompt(text, source_lang, target_lang, translation_type)
+                partial = ""
+                for chunk in self.model.generate_content(prompt, stream=True):
+                    partial += chunk.text
+                    display_translation_result(partial, translation_type, target_lang, placeholder=placeholder)
+                
+                if partial.strip():
+                    result = partial.strip()
+                    self._store_translation(cache_key, result)
+                    return result
+                return "No translation received from API"
+            else:
+                prompt = self._build_prompt(text, source_lang, target_lang, translation_type)
+                response = self.model.generate_content(prompt)
+            
+            if response and response.text:
+                result = response.text.strip()
+                self._store_translation(cache_key, result)
+                return result
+            else:
+                return "No translation received from API"
+                
+        except Exception as e:
+            error_msg = f"Translation error: {str(e)}"
+            st.error(error_msg)
+            return error_msg
+
+    async def _translate_one_async(self, text: str, source_lang: str, target_lang: str, translation_type: str) -> str:
+        prompt = self._build_prompt(text, source_lang, target_lang, translation_type)
+        response = await self.model.generate_content_async(prompt)
+        if response and response.text:
+            return response.text.strip()
+        return "No translation received from API"
+
+    async def _translate_combined_async(self, texts: list, source_lang: str, target_lang: str, translation_type: str) -> list:
+        """Translate several texts with one numbered prompt; returns None if the reply can't be split back"""
+        entries = "\n\n".join(f"[[{n}]]\n{text.strip()}" for n, text in enumerate(texts, 1))
+        prompt = (
+            f"The text below contains {len(texts)} entries, each preceded by a marker like [[1]]. "
+            "Translate every entry separately and repeat each marker on its own line before its translation.\n\n"
+            + self._build_prompt(entries, source_lang, target_lang, translation_type)
+        )
+        response = await self.model.generate_content_async(prompt)
+        if not (response and response.text):
+            return None
+
+        parts = _BATCH_MARKER_RE.split(response.text)
+        translations = {int(number): body.strip() for number, body in zip(parts[1::2], parts[2::2])}
+        if sorted(translations) != list(range(1, len(texts) + 1)) or not all(translations.values()):
+            return None
+        return [translations[n] for n in range(1, len(texts) + 1)]
+
+    async def translate_batch(self, items: list) -> list:
+        """Translate (text, source_lang, target_lang, translation_type) items concurrently"""
+        results = [None] * len(items)
+        pending = []
+        for i, (text, source_lang, target_lang, translation_type) in enumerate(items):
+            if not text.strip():
+                results[i] = "No text provided"
+                continue
+            cache_key = self._cache_key(text, source_lang, target_lang, translation_type)
+            cached = self._cached_translation(cache_key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append((i, cache_key))
+
+        if not pending:
+            return results
+
+        # Homogeneous batches go out as a single combined prompt
+        settings = {items[i][1:] for i, _ in pending}
+        translations = None
+        if len(pending) > 1 and len(settings) == 1:
+            source_lang, target_lang, translation_type = settings.pop()
+            try:
+                translations = await self._translate_combined_async(
+                    [items[i][0] for i, _ in pending], source_lang, target_lang, translation_type
+                )
+            except Exception:
+                translations = None
+
+        # Otherwise (or if the combined reply was malformed) issue the requests in parallel
+        if translations is None:
+            translations = await asyncio.gather(
+                *(self._translate_one_async(*items[i]) for i, _ in pending),
+                return_exceptions=True
+            )
+
+        for (i, cache_key), translation in zip(pending, translations):
+            if isinstance(translation, Exception):
+                results[i] = f"Translation error: {str(translation)}"
+            else:
+                results[i] = translation
+                if translation != "No translation received from API":
+                    self._store_translation(cache_key, translation)
+        return results
+
+class TranslationHistory:
+    """SQLite-backed translation history shared by all reruns of the app"""
+
+    _COLUMNS = ('timestamp', 'source_lang', 'target_lang', 'original', 'translation', 'type')
+
+    def __init__(self, path: str):
+        # Streamlit serves reruns from different threads, so guard the shared connection
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, ts TEXT, src TEXT, tgt TEXT, orig TEXT, trans TEXT, type TEXT)"
+            )
+
+    def add(self, *entries: dict) -> None:
+        rows = [tuple(entry[column] for column in self._COLUMNS) for entry in entries]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO history (ts, src, tgt, orig, trans, type) VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def page(self, offset: int, limit: int = HISTORY_PAGE_SIZE) -> list:
+        """Return entries newest first, each with its row id"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, ts, src, tgt, orig, trans, type FROM history ORDER BY id DESC LIMIT ? OFFSET ?",
+                (limit, offset)
+            ).fetchall()
+        return [dict(zip(('id',) + self._COLUMNS, row)) for row in rows]
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM history")
+
+@st.cache_resource
+def get_history() -> TranslationHistory:
+    return TranslationHistory(HISTORY_DB_PATH)
+
+def get_translator(api_key: str) -> TranslationAgent:
+    """Reuse this session's TranslationAgent across reruns instead of rebuilding it on every interaction"""
+    translator = st.session_state.get('translator')
+    if translator is None or translator.api_key != api_key:
+        translator = TranslationAgent(api_key)
+        st.session_state.translator = translator
+    else:
+        # genai.configure is process-wide, so keep it pointed at this session's key
+        genai.configure(api_key=api_key)
+        translator.check_connection()
+    return translator
+
+def create_audio_player(audio_data: bytes, key: str = None) -> None:
+    """Create audio player using Streamlit's native audio widget"""
+    if audio_data:
+        try:
+            # Use Streamlit's built-in audio player
+            st.audio(audio_data, format='audio/mp3')
+        except Exception as e:
+            st.error(f"Audio playback error: {str(e)}")
+    else:
+        st.error("No audio data available")
+
+def create_download_link(audio_data: bytes, filename: str) -> None:
+    """Create a download button for audio data"""
+    if audio_data:
+        st.download_button(
+            label="⬇️ Download Audio",
+            data=audio_data,
+            file_name=filename,
+            mime="audio/mp3"
+        )
+
+def display_translation_result(result: str, translation_type: str = "standard", target_language: str = "English", translator=None, placeholder=None):
+    """Display translation result with proper styling, replacing the placeholder's content if one is given"""
+    
+    scheme = _COLOR_SCHEMES.get(translation_type, _COLOR_SCHEMES["standard"])
+    
+    # Clean the result text (remove any unwanted formatting)
+    clean_result = _CLEAN_RE.sub('', result).strip()
+    
+    # Display with improved styling
+    target = placeholder if placeholder is not None else st
+    target.markdown(_RESULT_TPL.substitute(
+        bg=scheme['bg'], border=scheme['border'], icon=scheme['icon'], text=html.escape(clean_result)
+    ), unsafe_allow_html=True)
+
+@st.fragment
+def _voice_section(translator: TranslationAgent, history: TranslationHistory) -> None:
+    """Voice Translation view; widget interactions rerun only this fragment"""
+    st.header("🎤 Voice Translation")
+    st.info("Speak in one language and get voice output in another!")
+    
+    # Check if required packages are available
+    try:
+        import speech_recognition as sr
+        from gtts import gTTS
+    except ImportError:
+        st.error("📦 Required packages missing. Please install: pip install SpeechRecognition gTTS pyaudio")
+        st.info("Note: You may also need to install portaudio for microphone support")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        source_lang_voice = st.selectbox("Source Language", _LANGUAGE_NAMES, key="voice_source")
+    with col2:
+        target_lang_voice = st.selectbox("Target Language", _LANGUAGE_NAMES, index=1, key="voice_target")
+    
+    # Voice input section
+    st.markdown("### 🎤 Voice Input")
+    col1, col2, col3 = st.columns([2, 1, 2])
+    
+    with col1:
+        if st.button("🎤 Start Recording", type="primary", use_container_width=True):
+            with st.spinner("Initializing microphone..."):
+                spoken_text = translator.speech_to_text()
+                
+            if spoken_text and not spoken_text.startswith("Error") and not spoken_text.startswith("Could not") and not spoken_text.startswith("Listening timeout"):
+                st.session_state.voice_input = spoken_text
+                st.success(f"✅ Speech captured: '{spoken_text}'")
+                # Translate while the user reviews the transcript
+                translator.prefetch_translation(spoken_text, source_lang_voice, target_lang_voice, "voice")
+            else:
+                st.error(f"❌ {spoken_text}")
+    
+    with col2:
+        st.markdown("<div style='text-align: center; padding: 10px;'>OR</div>", unsafe_allow_html=True)
+        
+    with col3:
+        if st.button("📝 Use Text Input", use_container_width=True):
+            st.session_state.use_text_input = True
+    
+    # Display captured text or text input
+    if hasattr(st.session_state, 'voice_input'):
+        voice_text = st.text_area("Captured Speech:", 
+                                value=st.session_state.voice_input, 
+                                height=100, 
+                                key="voice_display")
+    elif hasattr(st.session_state, 'use_text_input') and st.session_state.use_text_input:
+        voice_text = st.text_area("Enter text for voice translation:", 
+                                height=100, 
+                                placeholder="Type your text here...",
+                                key="voice_text_input")
+    else:
+        voice_text = st.text_area("Speech will appear here after recording:", 
+                                height=100, 
+                                disabled=True,
+                                key="voice_placeholder")
+    
+    # Translation and audio output
+    if st.button("🔄 Translate & Speak", type="primary", use_container_width=True):
+        if voice_text and voice_text.strip():
+            with st.spinner("Translating..."):
+                # Perform translation
+                result = translator.translate_text(voice_text, source_lang_voice, target_lang_voice, "voice")
+                
+            if result and "Translation error" not in result and "No translation" not in result:
+                st.success("✅ Voice translation completed!")
+                
+                # Keep the latest result so reruns redraw it without re-synthesizing
+                st.session_state.voice_result = {
+                    'source_lang': source_lang_voice,
+                    'target_lang': target_lang_voice,
+                    'original': voice_text,
+                    'translation': result,
+                    'stamp': datetime.now().strftime('%Y%m%d_%H%M%S'),
+                    'audio_ready': False
+                }
+                
+                # Save to history
+                history.add({
+                    'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    'source_lang': source_lang_voice,
+                    'target_lang': target_lang_voice,
+                    'original': voice_text,
+                    'translation': result,
+                    'type': 'voice'
+                })
+                
+                st.balloons()
+            else:
+                st.session_state.pop('voice_result', None)
+                st.error(f"❌ Translation failed: {result}")
+        else:
+            st.warning("⚠️ Please record speech or enter text first.")
+    
+    voice_result = st.session_state.get('voice_result')
+    if voice_result:
+        original, translation = voice_result['original'], voice_result['translation']
+        
+        # Display translation result
+        display_translation_result(translation, "voice", voice_result['target_lang'], translator)
+        
+        # Audio slots are laid out before synthesis so the players appear in place
+        st.markdown("### 🔊 Audio Playback")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("**🎤 Original Audio**")
+            st.write(f"Language: {voice_result['source_lang']}")
+            st.write(f"Text: _{original[:50]}{'...' if len(original) > 50 else ''}_")
+            orig_audio_slot = st.empty()
+        
+        with col2:
+            st.markdown("**🌐 Translation Audio**")
+            st.write(f"Language: {voice_result['target_lang']}")
+            st.write(f"Text: _{translation[:50]}{'...' if len(translation) > 50 else ''}_")
+            trans_audio_slot = st.empty()
+        
+        if not voice_result['audio_ready']:
+            # Both clips are independent network calls, so synthesize them concurrently
+            with st.spinner("Generating audio..."):
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    f_orig = executor.submit(translator.text_to_speech, original, voice_result['source_lang'])
+                    f_trans = executor.submit(translator.text_to_speech, translation, voice_result['target_lang'])
+                    voice_result['original_audio'], voice_result['translation_audio'] = f_orig.result(), f_trans.result()
+            voice_result['audio_ready'] = True
+        
+        with orig_audio_slot.container():
+            if voice_result['original_audio']:
+                create_audio_player(voice_result['original_audio'])
+                create_download_link(voice_result['original_audio'], f"original_{voice_result['stamp']}.mp3")
+            else:
+                st.error("Failed to generate original audio")
+        
+        with trans_audio_slot.container():
+            if voice_result['translation_audio']:
+                create_audio_player(voice_result['translation_audio'])
+                create_download_link(voice_result['translation_audio'], f"translation_{voice_result['stamp']}.mp3")
+            else:
+                st.error("Failed to generate translation audio")
+    
+    # Voice translation tips
+    with st.expander("💡 Voice Translation Tips"):
+        st.markdown("""
+        **For better results:**
+        - Speak clearly and at a moderate pace
+        - Minimize background noise
+        - Use short sentences for better accuracy
+        - Ensure your microphone is working properly
+        
+        **Audio Features:**
+        - ✅ Native Streamlit audio player (no external dependencies)
+        - ✅ Direct download of MP3 files
+        - ✅ Reliable audio generation and playback
+        - ✅ Works across all browsers and devices
+        
+        **Requirements:**
+        - Working microphone
+        - Internet connection for speech services
+        - Audio output device for playback
+        
+        **Troubleshooting:**
+        - Audio now uses Streamlit's native player - should work reliably
+        - If microphone doesn't work, try refreshing the page
+        - Check browser permissions for microphone access
+        - Use the "Use Text Input" option as an alternative
+        """)
+
+@st.fragment
+def _standard_section(translator: TranslationAgent, history: TranslationHistory) -> None:
+    """Standard Translation view; widget interactions rerun only this fragment"""
+    st.header("📝 Standard Translation")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        source_lang = st.selectbox("Source Language", ("Auto-detect",) + _LANGUAGE_NAMES)
+    with col2:
+        target_lang = st.selectbox("Target Language", _LANGUAGE_NAMES, index=1)
+    
+    selected_example = st.selectbox("Quick Examples (optional):", _EXAMPLE_NAMES)
+    
+    if selected_example != "Custom":
+        text_input = st.text_area("Enter text to translate", 
+                                value=_EXAMPLE_TEXTS[selected_example], 
+                                height=150)
+    else:
+        text_input = st.text_area("Enter text to translate", height=150)
+    
+    if st.button("🔄 Translate", type="primary", use_container_width=True):
+        if text_input.strip():
+            with st.spinner("Translating..."):
+                try:
+                    # Auto-detect language if needed
+                    if source_lang == "Auto-detect":
+                        detected_lang = translator.detect_language(text_input)
+                        st.info(f"🔍 Detected language: **{detected_lang}**")
+                        source_lang = detected_lang
+                    
+                    # Perform translation, streaming partial output into the result slot
+                    result_slot = st.empty()
+                    result = translator.translate_text(text_input, source_lang, target_lang, "standard", placeholder=result_slot)
+                    
+                    if result and "Translation error" not in result and "No translation" not in result:
+                        # Display translation with improved styling
+                        display_translation_result(result, "standard", target_lang, translator, placeholder=result_slot)
+                        st.success("✅ Translation completed successfully!")
+                        
+                        # Add audio playback option
+                       # st.markdown("### 🔊 Audio Playback")
+                        #if st.button("🔊 Generate Audio", key=f"play_standard_{hash(result)}"):
+                         #   with st.spinner("Generating audio..."):
+                          #      audio_data = translator.text_to_speech(result, target_lang)
+                           #     if audio_data:
+                            #        create_audio_player(audio_data)
+                             #       create_download_link(audio_data, f"translation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp3")
+                              #      st.success("🔊 Audio generated successfully!")
+                               # else:
+                                #    st.error("Failed to generate audio")
+                        
+                        # Copy area
+                        st.text_area("📋 Copy Translation:", value=result, height=80, key="copy_standard")
+                        
+                        # Save to history
+                        history.add({
+                            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                            'source_lang': source_lang,
+                            'target_lang': target_lang,
+                            'original': text_input,
+                            'translation': result,
+                            'type': 'standard'
+                        })
+                        
+                        st.balloons()
+                    else:
+                        result_slot.empty()
+                        st.error(f"❌ Translation failed: {result}")
+                        
+                except Exception as e:
+                    st.error(f"❌ An error occurred: {str(e)}")
+        else:
+            st.warning("⚠️ Please enter some text to translate.")
+
+@st.fragment
+def _batch_section(translator: TranslationAgent, history: TranslationHistory) -> None:
+    """Batch Translation view; widget interactions rerun only this fragment"""
+    st.header("📦 Batch Translation")
+    st.info("Enter one text per line to translate them all at once.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        source_lang_batch = st.selectbox("Source Language", _LANGUAGE_NAMES, key="batch_source")
+    with col2:
+        target_lang_batch = st.selectbox("Target Language", _LANGUAGE_NAMES, index=1, key="batch_target")
+    
+    batch_input = st.text_area("Texts to translate (one per line)", height=200, key="batch_input")
+    
+    if st.button("🔄 Translate All", type="primary", use_container_width=True):
+        lines = [line.strip() for line in batch_input.splitlines() if line.strip()]
+        if lines:
+            with st.spinner(f"Translating {len(lines)} texts..."):
+                try:
+                    items = [(line, source_lang_batch, target_lang_batch, "standard") for line in lines]
+                    results = asyncio.run(translator.translate_batch(items))
+                except Exception as e:
+                    st.error(f"❌ An error occurred: {str(e)}")
+                    results = []
+            
+            entries = []
+            for n, (original, result) in enumerate(zip(lines, results), 1):
+                if "Translation error" not in result and "No translation" not in result:
+                    st.markdown(f"**{n}.** {original}")
+                    display_translation_result(result, "standard", target_lang_batch, translator)
+                    entries.append({
+                        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        'source_lang': source_lang_batch,
+                        'target_lang': target_lang_batch,
+                        'original': original,
+                        'translation': result,
+                        'type': 'standard'
+                    })
+                else:
+                    st.error(f"❌ {n}. Translation failed: {result}")
+            
+            # Save to history in one transaction
+            if entries:
+                history.add(*entries)
+            
+            if results:
+                st.success(f"✅ Translated {len(results)} texts!")
+        else:
+            st.warning("⚠️ Please enter at least one line of text.")
+
+@st.fragment
+def _history_section(translator: TranslationAgent, history: TranslationHistory) -> None:
+    """Translation History view; widget interactions rerun only this fragment"""
+    st.header("📚 Translation History")
+    
+    total = history.count()
+    if total:
+        st.info(f"Total translations: {total}")
+        
+        # Only the selected page is loaded and rendered
+        pages = (total + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1) if pages > 1 else 1
+        offset = (page - 1) * HISTORY_PAGE_SIZE
+        
+        # Display history
+        for i, entry in enumerate(history.page(offset)):
+            with st.expander(f"Translation {total - offset - i}: {entry['source_lang']} → {entry['target_lang']} ({entry['type']})"):
+                st.write(f"**Timestamp:** {entry['timestamp']}")
+                st.write(f"**Original ({entry['source_lang']}):** {entry['original']}")
+                st.write(f"**Translation ({entry['target_lang']}):** {entry['translation']}")
+                
+                # Option to regenerate audio for history items
+                if st.button(f"🔊 Generate Audio", key=f"history_audio_{entry['id']}"):
+                    audio_slot = st.empty()
+                    audio_data = None
+                    with st.spinner("Generating audio..."):
+                        try:
+                            # Show a playable prefix as soon as it is buffered
+                            for audio_data in translator.text_to_speech_stream(entry['translation'], entry['target_lang']):
+                                audio_slot.audio(audio_data, format='audio/mp3')
+                        except Exception as e:
+                            st.error(f"Text-to-speech error: {str(e)}")
+                            audio_data = None
+                    if audio_data:
+                        st.success("Audio generated!")
+                    else:
+                        st.error("Failed to generate audio")
+        
+        # Clear history option
+        if st.button("🗑️ Clear History", type="secondary"):
+            history.clear()
+            st.success("History cleared!")
+            st.rerun()
+    else:
+        st.info("No translation history yet. Start translating to see your history here!")
+
+def main():
+    st.title("🌐 Advanced Translation Agent")
+    st.markdown("*Powered by Google Gemini AI*")
+    
+    # Custom CSS for better styling
+    st.markdown("""
+    <style>
+    .stTextArea textarea {
+        background-color: #fafdff;
+        border: 2px solid #e9ecef;
+        border-radius: 8px;
+    }
+    .stTextArea textarea:focus {
+        border-color: #007bff;
+        box-shadow: 0 0 0 0.2rem rgba(0,123,255,.25);
+    }
+    .stSelectbox > div > div {
+        background-color: #fafdff;
+        border-radius: 8px;
+    }
+    .audio-section {
+        background-color: #f0f8ff;
+        padding: 15px;
+        border-radius: 10px;
+        border: 1px solid #4169E1;
+        margin: 10px 0;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+    
+    # Sidebar configuration
+    with st.sidebar:
+        st.header("🔧 Configuration")
+        
+        # API Key input with better instructions
+        st.markdown("### Google AI API Key")
+        st.markdown("1. Go to [Google AI Studio](https://aistudio.google.com/app/apikey)")
+        st.markdown("2. Create a new API key")
+        st.markdown("3. Paste it below:")
+        
+        api_key = st.text_input("API Key", type="password", placeholder="Your Google AI API key here...")
+        
+        if not api_key:
+            st.error("⚠️ Please enter your Google AI API key to continue")
+            st.stop()
+        
+        # Test API key
+        with st.spinner("Testing API connection..."):
+            try:
+                translator = get_translator(api_key)
+            except Exception as e:
+                st.error(f"❌ API connection failed: {str(e)}")
+                st.info("Please check your API key and try again.")
+                st.stop()
+        
+        # Feature selection
+        st.header("🚀 Features")
+        selected_feature = st.selectbox(
+            "Choose Translation Feature",
+            ["Standard Translation", "Voice Translation", "Creative Translation", "Technical Translation", 
+             "Formal Translation", "Document Translation", "Batch Translation", 
+             "Language Detection", "Translation History"]
+        )
+
+    history = get_history()
+
+    # Voice Translation - Fixed Version
+    if selected_feature == "Voice Translation":
+        _voice_section(translator, history)
+
+    # Standard Translation
+    elif selected_feature == "Standard Translation":
+        _standard_section(translator, history)
+
+    # Batch Translation
+    elif selected_feature == "Batch Translation":
+        _batch_section(translator, history)
+
+    # Translation History
+    elif selected_feature == "Translation History":
+        _history_section(translator, history)
+
+    # Other features placeholder
+    else:
+        st.header(f"🔧 {selected_feature}")
+        st.info(f"The {selected_feature} feature is coming soon! For now, try Voice Translation, Standard Translation or Batch Translation.")
+        
+        # Show available features
+        st.markdown("### Available Features:")
+        st.markdown("- ✅ **Voice Translation** - Speak and get voice output")
+        st.markdown("- ✅ **Standard Translation** - Text-to-text translation")
+        st.markdown("- ✅ **Batch Translation** - Translate many texts at once")
+        st.markdown("- ✅ **Translation History** - View your translation history")
+        st.markdown("- 🚧 Other features coming soon...")
+
+    # Footer
+    st.markdown("---")
+    st.markdown("🌐 **Advanced Translation Agent** | Powered by Google Gemini AI")
+    st.markdown("**✅ Fixed Audio Version** - All audio controls now working with native Streamlit audio player!")
+
+if __name__ == "__main__":
+
+    main()
+